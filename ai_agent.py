@@ -1,57 +1,310 @@
+from pydantic import BaseModel
 from pydantic_ai import Agent, BinaryContent
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
+import asyncio
+import hashlib
+import httpx
 import os
 import io
-import json
-import re
+import threading
+from collections import OrderedDict
 from PIL import Image
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+
+class GridResponse(BaseModel):
+    """Structured grid analysis result returned by the model."""
+    
+    cells: List[int]
+    confidence_scores: List[int]
 
 
 class SimpleAIAgent:
     """AI agent for analyzing grid images and detecting objects."""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the AI agent.
         
         Args:
             api_key: OpenAI API key. If None, will use environment variable.
+            http_client: Shared HTTP client for OpenAI requests, so a long-running server
+                reuses pooled keep-alive connections. If None, pydantic-ai's default is used.
         """
         if api_key:
             os.environ["OPENAI_API_KEY"] = api_key
         
-        # Initialize pydantic-ai Agent with OpenAI GPT-4o model
-        self.agent = Agent('openai:gpt-4o')
+        # Initialize pydantic-ai Agent with OpenAI GPT-4o model, validating output as GridResponse
+        if http_client is not None:
+            model = OpenAIChatModel('gpt-4o', provider=OpenAIProvider(http_client=http_client))
+        else:
+            model = 'openai:gpt-4o'
+        self.agent = Agent(model, output_type=GridResponse)
+        
+        # Recently encoded grid images, keyed by id() and holding the image so the id stays valid
+        self._image_cache: OrderedDict[int, Tuple[Image.Image, bytes]] = OrderedDict()
+        self._image_cache_size = 8
+        
+        # Async analyses currently running, keyed by (event loop, (image digest, description)),
+        # so identical concurrent requests share one model call. A task can only be awaited
+        # on its own loop, and threads driving the agent each run their own.
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, Tuple[bytes, str]], asyncio.Task] = {}
+        
+        # Completed analyses, keyed the same way, so repeated queries skip the model call
+        self._response_cache: OrderedDict[Tuple[bytes, str], Dict[str, List]] = OrderedDict()
+        self._response_cache_size = 1024
         
-    def analyze_grid(self, grid_image: Image.Image, object_description: str) -> Dict[str, List]:
+        # Guards both caches when one agent is shared by detection threads
+        self._cache_lock = threading.Lock()
+        
+    def analyze_grid(self, grid_image: Image.Image, object_description: str, image_data: Optional[bytes] = None) -> Dict[str, List]:
         """
         Analyze a grid image to find cells containing the target object.
         
         Args:
             grid_image: PIL Image with grid overlay
             object_description: Description of object to find
+            image_data: PNG or JPEG bytes of grid_image when the caller already encoded it, sent as is;
+                grid_image is encoded (and cached) here when None
             
         Returns:
             Dict with 'cells' and 'confidence_scores' lists
         """
+        # Nothing to look for: skip the model call
+        if not object_description or not object_description.strip():
+            return {'cells': [], 'confidence_scores': []}
+        
         # Convert PIL Image to binary content for multimodal input
-        buffer = io.BytesIO()
-        grid_image.save(buffer, format='PNG')
-        buffer.seek(0)
-        image_data = buffer.read()
+        if image_data is None:
+            image_data = self._encode_image(grid_image)
+        
+        # Same grid and description as an earlier call: reuse its answer
+        key = self._response_key(image_data, object_description)
+        if (cached := self._get_cached_response(key)) is not None:
+            return cached
+        
+        # Send multimodal message using BinaryContent with binary data
+        result = self.agent.run_sync(self._build_message(self._grid_prompt(object_description), image_data))
+
+        print(result.output)
+        
+        return self._cache_response(key, result.output.model_dump())
+    
+    async def analyze_grid_async(self, grid_image: Image.Image, object_description: str, image_data: Optional[bytes] = None) -> Dict[str, List]:
+        """
+        Async variant of analyze_grid, so several analyses can overlap on one event loop.
+        
+        Concurrent calls for the same image bytes and description are coalesced
+        into a single model request.
+        
+        Args:
+            grid_image: PIL Image with grid overlay
+            object_description: Description of object to find
+            image_data: PNG or JPEG bytes of grid_image when the caller already encoded it, sent as is;
+                grid_image is encoded (and cached) here when None
+            
+        Returns:
+            Dict with 'cells' and 'confidence_scores' lists
+        """
+        if not object_description or not object_description.strip():
+            return {'cells': [], 'confidence_scores': []}
+        
+        if image_data is None:
+            image_data = self._encode_image(grid_image)
+        
+        key = self._response_key(image_data, object_description)
+        if (cached := self._get_cached_response(key)) is not None:
+            return cached
+        
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self.agent.run(self._build_message(self._grid_prompt(object_description), image_data))
+            )
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        
+        # Shield so one cancelled caller does not cancel the request for the others
+        result = await asyncio.shield(task)
+        
+        return self._cache_response(key, result.output.model_dump())
+    
+    def analyze_grids(self, grid_images: List[Image.Image], object_description: str) -> List[Dict[str, List]]:
+        """
+        Analyze several grid overlays of the same scene for one object in a single request.
+        
+        Each result is cached as if analyze_grid had been called on that image alone.
+        
+        Args:
+            grid_images: PIL Images with grid overlays, e.g. a coarse and a finer grid
+            object_description: Description of object to find
+            
+        Returns:
+            One dict with 'cells' and 'confidence_scores' lists per image, in order
+        """
+        if not object_description or not object_description.strip():
+            return [{'cells': [], 'confidence_scores': []} for _ in grid_images]
+        
+        image_data = [self._encode_image(grid_image) for grid_image in grid_images]
+        keys = [self._response_key(data, object_description) for data in image_data]
+        cached = [self._get_cached_response(key) for key in keys]
+        if all(response is not None for response in cached):
+            return cached
+        
+        # All images travel in one multimodal request
+        result = self.agent.run_sync(
+            self._build_message(self._grids_prompt(object_description, len(grid_images)), *image_data),
+            output_type=List[GridResponse]
+        )
+        
+        return self._split_grids_response(result.output, keys)
+    
+    async def analyze_grids_async(self, grid_images: List[Image.Image], object_description: str) -> List[Dict[str, List]]:
+        """
+        Async variant of analyze_grids.
+        
+        Args:
+            grid_images: PIL Images with grid overlays, e.g. a coarse and a finer grid
+            object_description: Description of object to find
+            
+        Returns:
+            One dict with 'cells' and 'confidence_scores' lists per image, in order
+        """
+        if not object_description or not object_description.strip():
+            return [{'cells': [], 'confidence_scores': []} for _ in grid_images]
+        
+        image_data = [self._encode_image(grid_image) for grid_image in grid_images]
+        keys = [self._response_key(data, object_description) for data in image_data]
+        cached = [self._get_cached_response(key) for key in keys]
+        if all(response is not None for response in cached):
+            return cached
         
+        result = await self.agent.run(
+            self._build_message(self._grids_prompt(object_description, len(grid_images)), *image_data),
+            output_type=List[GridResponse]
+        )
+        
+        return self._split_grids_response(result.output, keys)
+    
+    def analyze_grid_multi(self, grid_image: Image.Image, object_descriptions: List[str], image_data: Optional[bytes] = None) -> Dict[str, Dict[str, List]]:
+        """
+        Analyze a grid image for several target objects in a single request.
+        
+        Args:
+            grid_image: PIL Image with grid overlay
+            object_descriptions: Descriptions of the objects to find
+            image_data: PNG or JPEG bytes of grid_image when the caller already encoded it, sent as is;
+                grid_image is encoded (and cached) here when None
+            
+        Returns:
+            Dict mapping each object description to its 'cells' and 'confidence_scores' lists.
+            Descriptions the model left unanswered are missing, so callers can analyze them separately.
+        """
+        # Only send targets that actually describe something; blank ones get empty results
+        targets = [desc for desc in object_descriptions if desc and desc.strip()]
+        if not targets:
+            return {desc: {'cells': [], 'confidence_scores': []} for desc in object_descriptions}
+        
+        if image_data is None:
+            image_data = self._encode_image(grid_image)
+        
+        # One multimodal request covers all targets, validated per target
+        result = self.agent.run_sync(self._build_message(self._multi_prompt(targets), image_data), output_type=Dict[str, GridResponse])
+        
+        return self._split_multi_response(result.output, targets, object_descriptions)
+    
+    async def analyze_grid_multi_async(self, grid_image: Image.Image, object_descriptions: List[str], image_data: Optional[bytes] = None) -> Dict[str, Dict[str, List]]:
+        """
+        Async variant of analyze_grid_multi.
+        
+        Args:
+            grid_image: PIL Image with grid overlay
+            object_descriptions: Descriptions of the objects to find
+            image_data: PNG or JPEG bytes of grid_image when the caller already encoded it, sent as is;
+                grid_image is encoded (and cached) here when None
+            
+        Returns:
+            Dict mapping each answered object description to its 'cells' and 'confidence_scores' lists
+        """
+        targets = [desc for desc in object_descriptions if desc and desc.strip()]
+        if not targets:
+            return {desc: {'cells': [], 'confidence_scores': []} for desc in object_descriptions}
+        
+        if image_data is None:
+            image_data = self._encode_image(grid_image)
+        
+        result = await self.agent.run(self._build_message(self._multi_prompt(targets), image_data), output_type=Dict[str, GridResponse])
+        
+        return self._split_multi_response(result.output, targets, object_descriptions)
+    
+    def _response_key(self, image_data: bytes, object_description: str) -> Tuple[bytes, str]:
+        """
+        Build the cache key for a single-object analysis.
+        
+        Args:
+            image_data: Encoded grid image
+            object_description: Description of object to find
+            
+        Returns:
+            Tuple of the image digest and the normalized description
+        """
+        return hashlib.sha256(image_data).digest(), " ".join(object_description.lower().split())
+    
+    def _get_cached_response(self, key: Tuple[bytes, str]) -> Optional[Dict[str, List]]:
+        """
+        Look up a completed analysis, marking it as recently used.
+        
+        Args:
+            key: Key from _response_key
+            
+        Returns:
+            Copy of the cached result, or None if not cached
+        """
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is None:
+                return None
+            self._response_cache.move_to_end(key)
+        return {name: list(values) for name, values in cached.items()}
+    
+    def _cache_response(self, key: Tuple[bytes, str], response: Dict[str, List]) -> Dict[str, List]:
+        """
+        Store a completed analysis, evicting the least recently used one when full.
+        
+        Args:
+            key: Key from _response_key
+            response: Dict with 'cells' and 'confidence_scores' lists
+            
+        Returns:
+            The response, unchanged
+        """
+        with self._cache_lock:
+            self._response_cache[key] = {name: list(values) for name, values in response.items()}
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self._response_cache_size:
+                self._response_cache.popitem(last=False)
+        return response
+    
+    def _grid_prompt(self, object_description: str) -> str:
+        """
+        Build the single-object grid analysis prompt.
+        
+        Args:
+            object_description: Description of object to find
+            
+        Returns:
+            Prompt text
+        """
         # Create prompt for grid analysis
-        prompt = f"""You are analyzing an image with a numbered grid overlay. Your task is to identify which grid cells contain any part of: {object_description}
+        return f"""You are analyzing an image with a numbered grid overlay. Your task is to identify which grid cells contain any part of: {object_description}
 
 Look at each numbered cell and determine:
 1. Does this cell contain any portion of the target object?
 2. What's your confidence percentage (0-100%)?
 
-Return ONLY this format:
-{{
-    'cells': [cell_numbers_with_object],
-    'confidence_scores': [confidence_for_each_cell]
-}}
+Report the cell numbers containing the object in 'cells' and the confidence for each of those cells, in the same order, in 'confidence_scores'.
 
 Confidence guidelines:
 - 90-100%: Most of cell contains object
@@ -61,45 +314,169 @@ Confidence guidelines:
 - Below 60%: Too uncertain - omit cell
 
 Only include cells with confidence ≥60%. Sort cell numbers in ascending order."""
+    
+    def _grids_prompt(self, object_description: str, count: int) -> str:
+        """
+        Build the prompt for several grid overlays of the same scene.
+        
+        Args:
+            object_description: Description of object to find
+            count: Number of attached grid images
+            
+        Returns:
+            Prompt text
+        """
+        return f"""You are given {count} images of the same scene, each with its own numbered grid overlay. Your task is to identify, separately for each image, which of its grid cells contain any part of: {object_description}
 
-        # Send multimodal message using BinaryContent with binary data
-        result = self.agent.run_sync([
-            prompt,
-            BinaryContent(data=image_data, media_type='image/png')
-        ])
+For every image, look at each numbered cell and determine:
+1. Does this cell contain any portion of the target object?
+2. What's your confidence percentage (0-100%)?
 
-        print(result.output)
+Report one result per image, in the order the images were given, each with its 'cells' and matching 'confidence_scores'.
+
+Confidence guidelines:
+- 90-100%: Most of cell contains object
+- 80-89%: About half the cell contains object  
+- 70-79%: Substantial portion but less than half
+- 60-69%: Small edge or corner of object
+- Below 60%: Too uncertain - omit cell
+
+Only include cells with confidence ≥60%. Sort cell numbers in ascending order."""
+    
+    def _multi_prompt(self, object_descriptions: List[str]) -> str:
+        """
+        Build the multi-object grid analysis prompt.
         
-        # Parse the response to extract structured data
-        return self._parse_response(result.output)
+        Args:
+            object_descriptions: Descriptions of the objects to find
+            
+        Returns:
+            Prompt text
+        """
+        # Number the targets so the model can key its answer by index
+        targets = "\n".join(f"{i}. {desc}" for i, desc in enumerate(object_descriptions))
+        
+        return f"""You are analyzing an image with a numbered grid overlay. Your task is to identify, for each of the following targets, which grid cells contain any part of it:
+{targets}
+
+For every target, look at each numbered cell and determine:
+1. Does this cell contain any portion of the target object?
+2. What's your confidence percentage (0-100%)?
+
+Report the result keyed by target number, giving each target its 'cells' and matching 'confidence_scores'.
+
+Confidence guidelines:
+- 90-100%: Most of cell contains object
+- 80-89%: About half the cell contains object  
+- 70-79%: Substantial portion but less than half
+- 60-69%: Small edge or corner of object
+- Below 60%: Too uncertain - omit cell
+
+Only include cells with confidence ≥60%. Sort cell numbers in ascending order. Include every target number, using empty lists when a target is not visible."""
     
-    def _parse_response(self, response: str) -> Dict[str, List]:
+    def _build_message(self, prompt: str, *image_data: bytes) -> List:
         """
-        Parse AI response to extract cells and confidence scores.
+        Pair a prompt with the encoded grid images as a multimodal message.
         
         Args:
-            response: Raw AI response string
+            prompt: Prompt text
+            image_data: Encoded image bytes, one argument per image
             
         Returns:
-            Dict with 'cells' and 'confidence_scores' lists
+            User prompt parts for the agent
+        """
+        # PNG is only used for images with transparency; everything else is JPEG
+        return [prompt] + [
+            BinaryContent(data=data, media_type='image/png' if data.startswith(b'\x89PNG') else 'image/jpeg')
+            for data in image_data
+        ]
+    
+    def _encode_image(self, grid_image: Image.Image) -> bytes:
+        """
+        Encode a PIL Image to JPEG bytes for upload, reusing the bytes when the
+        same grid image is analyzed again (e.g. for several objects).
+        
+        JPEG encodes several times faster than PNG and produces a much smaller
+        upload; PNG is kept only for images with real transparency.
+        
+        Args:
+            grid_image: PIL Image to encode
+            
+        Returns:
+            Encoded image bytes
+        """
+        with self._cache_lock:
+            cached = self._image_cache.get(id(grid_image))
+        if cached is not None and cached[0] is grid_image:
+            return cached[1]
+        
+        with io.BytesIO() as buffer:
+            if self._has_transparency(grid_image):
+                # Fast zlib level: the bytes only travel to the model, encode time matters more than size
+                grid_image.save(buffer, format='PNG', compress_level=1)
+            else:
+                rgb_image = grid_image if grid_image.mode == 'RGB' else grid_image.convert('RGB')
+                rgb_image.save(buffer, format='JPEG', quality=85, optimize=False)
+            image_data = buffer.getvalue()
+        
+        with self._cache_lock:
+            self._image_cache[id(grid_image)] = (grid_image, image_data)
+            while len(self._image_cache) > self._image_cache_size:
+                self._image_cache.popitem(last=False)
+        return image_data
+    
+    def _has_transparency(self, image: Image.Image) -> bool:
         """
-        try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                # Replace single quotes with double quotes for valid JSON
-                json_str = json_str.replace("'", '"')
-                parsed = json.loads(json_str)
-                
-                # Ensure we have the expected keys
-                if 'cells' in parsed and 'confidence_scores' in parsed:
-                    return {
-                        'cells': parsed['cells'],
-                        'confidence_scores': parsed['confidence_scores']
-                    }
-        except Exception:
-            pass
-        
-        # Fallback: return empty response
-        return {'cells': [], 'confidence_scores': []}
\ No newline at end of file
+        Check whether an image has any pixel that is not fully opaque.
+        
+        Args:
+            image: PIL Image to check
+            
+        Returns:
+            True if the image needs an alpha-capable format
+        """
+        if image.mode in ('RGBA', 'LA', 'PA'):
+            return image.getchannel('A').getextrema()[0] < 255
+        return 'transparency' in image.info
+    
+    def _split_grids_response(self, response: List[GridResponse], keys: List[Tuple[bytes, str]]) -> List[Dict[str, List]]:
+        """
+        Cache and unpack a per-image AI response.
+        
+        Args:
+            response: Validated AI response, one entry per image
+            keys: Cache keys of the images, in the order they were sent
+            
+        Returns:
+            One dict with 'cells' and 'confidence_scores' lists per image
+        """
+        if len(response) != len(keys):
+            raise ValueError(f"Expected {len(keys)} grid results, got {len(response)}")
+        
+        return [self._cache_response(key, entry.model_dump()) for key, entry in zip(keys, response)]
+    
+    def _split_multi_response(self, response: Dict[str, GridResponse], targets: List[str], object_descriptions: List[str]) -> Dict[str, Dict[str, List]]:
+        """
+        Map a multi-target AI response back onto the object descriptions.
+        
+        Args:
+            response: Validated AI response keyed by target number
+            targets: Descriptions in the order they were numbered in the prompt
+            object_descriptions: All requested descriptions, including ones not sent
+            
+        Returns:
+            Dict mapping each answered object description to its 'cells' and 'confidence_scores' lists
+        """
+        # Blank descriptions were never sent and have nothing to find
+        results = {desc: {'cells': [], 'confidence_scores': []} for desc in object_descriptions if not (desc and desc.strip())}
+        
+        # Targets the model skipped are left out rather than reported as not found; an
+        # answer keyed by the description instead of its number is still accepted
+        for i, desc in enumerate(targets):
+            entry = response.get(str(i))
+            if entry is None:
+                entry = response.get(desc)
+            if entry is not None:
+                results[desc] = entry.model_dump()
+        
+        return results
\ No newline at end of file
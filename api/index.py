@@ -1,19 +1,48 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional
-import tempfile
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import asyncio
+import httpx
+import io
 import os
-import shutil
 import uuid
-from pathlib import Path
-import asyncio
 
 # Import detection modules (now in same directory)
-from spatial_detector import SimpleSpatialDetector
+from spatial_detector import SimpleSpatialDetector, load_rgb_image
 from ai_agent import SimpleAIAgent
 
-app = FastAPI()
+# Global detector instance
+detector = None
+
+# Keep-alive pool for OpenAI: concurrent detections share warm connections
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=64)
+OPENAI_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Initialize detector on startup"""
+    global detector
+    try:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY environment variable is required")
+        
+        # One pooled client for every OpenAI request made by this instance
+        http_client = httpx.AsyncClient(limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT)
+        agent = SimpleAIAgent(api_key, http_client=http_client)
+        detector = SimpleSpatialDetector(agent)
+    except Exception as e:
+        print(f"Failed to initialize detector: {e}")
+        raise
+    
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -24,20 +53,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global detector instance
-detector = None
-
-def get_detector():
-    """Initialize detector lazily"""
-    global detector
-    if detector is None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY environment variable is required")
-        
-        agent = SimpleAIAgent(api_key)
-        detector = SimpleSpatialDetector(agent)
-    return detector
+# Recent result images held in memory (nothing is written to disk per request),
+# keyed by result id and holding (image bytes, media type)
+RESULT_CACHE_SIZE = 32
+result_cache: OrderedDict[str, Tuple[bytes, str]] = OrderedDict()
 
 class DetectionResult(BaseModel):
     object: str
@@ -52,6 +71,12 @@ class ApiResponse(BaseModel):
     results: List[DetectionResult]
     message: Optional[str] = None
 
+def encode_jpeg(image) -> bytes:
+    """Encode a result image for the in-memory cache"""
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
 @app.get("/")
 async def root():
     return {"message": "Vision Detection API is running"}
@@ -67,27 +92,14 @@ async def detect_objects(file: UploadFile = File(...), targets: str = Form(...))
     if not target_list:
         raise HTTPException(status_code=400, detail="At least one target object is required")
     
-    # Use temporary files for serverless environment
-    temp_dir = tempfile.mkdtemp()
-    
     try:
-        # Save uploaded file
-        file_extension = Path(file.filename or "image.jpg").suffix.lower()
-        if file_extension not in [".jpg", ".jpeg", ".png", ".webp"]:
-            file_extension = ".jpg"
-        
-        temp_filename = f"{uuid.uuid4()}{file_extension}"
-        temp_path = Path(temp_dir) / temp_filename
-        
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Decode the upload straight from memory (no temp file needed), off the event loop
+        data = await file.read()
+        img = await asyncio.to_thread(load_rgb_image, io.BytesIO(data))
         
-        # Get detector instance
-        detector_instance = get_detector()
-        
-        # Run detection in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        detections = await loop.run_in_executor(None, detector_instance.detect_multiple, str(temp_path), target_list)
+        # Async detection: the AI calls are awaited on the event loop, so no
+        # executor thread is tied up waiting on OpenAI
+        detections = await detector.detect_multiple_image_async(img, target_list)
         
         # Convert to API format
         api_results = [
@@ -95,13 +107,24 @@ async def detect_objects(file: UploadFile = File(...), targets: str = Form(...))
                 object=d["object"],
                 confidence=d["confidence"], 
                 confidence_score=d["confidence_score"],
-                bbox=[int(x) for x in d["bbox"]]
+                bbox=d["bbox"]  # already (left, top, right, bottom) ints from the detector
             ) for d in detections
         ]
         
-        # For serverless, return the image path (temporary)
+        # Use combined result image if available, otherwise original upload
+        if detections:
+            result_bytes = await asyncio.to_thread(encode_jpeg, detections[0]["combined_result_image"])
+            media_type = "image/jpeg"
+        else:
+            result_bytes, media_type = data, file.content_type
+        
+        # For serverless, keep the image in memory and serve it from /result/{id}
         # In production, you'd upload to cloud storage and return that URL
-        image_url = f"/uploads/{temp_filename}"
+        result_id = str(uuid.uuid4())
+        result_cache[result_id] = (result_bytes, media_type)
+        while len(result_cache) > RESULT_CACHE_SIZE:
+            result_cache.popitem(last=False)
+        image_url = f"/result/{result_id}"
         
         return ApiResponse(
             ok=True,
@@ -112,6 +135,13 @@ async def detect_objects(file: UploadFile = File(...), targets: str = Form(...))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Detection failed: {str(e)}")
-    finally:
-        # Clean up temporary directory
-        shutil.rmtree(temp_dir, ignore_errors=True)
\ No newline at end of file
+
+@app.get("/result/{result_id}")
+async def get_result(result_id: str):
+    """Serve a recent result image from the in-memory cache"""
+    cached = result_cache.get(result_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    
+    result_bytes, media_type = cached
+    return Response(content=result_bytes, media_type=media_type)
\ No newline at end of file
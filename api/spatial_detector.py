@@ -1,9 +1,103 @@
-from PIL import Image, ImageDraw, ImageFont
-from typing import Dict, List, Tuple
-from grid_utils import overlay_grid_on_image
+from PIL import Image, ImageDraw
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from statistics import fmean
+from typing import Dict, Generator, List, Optional, Tuple
+import asyncio
+import bisect
+import hashlib
+import threading
+from grid_utils import get_font, overlay_grid_on_image
 from ai_agent import SimpleAIAgent
 
 
+# Encodes and writes result images off the detection path
+_SAVE_POOL = ThreadPoolExecutor(max_workers=2)
+
+# Lower bound of each confidence category above "uncertain", and the categories in order
+_CONFIDENCE_THRESHOLDS = (45, 60, 75, 90)
+_CONFIDENCE_LABELS = ("uncertain", "low", "medium", "high", "certain")
+
+# Crops with a side shorter than this many original pixels are not cropped further
+_MIN_CROP_SIDE = 200
+
+# Single-object result colors and the 20pt label font
+_CONFIDENCE_COLORS = {
+    "certain": "green",
+    "high": "blue",
+    "medium": "orange",
+    "low": "yellow",
+    "uncertain": "red"
+}
+_LABEL_FONT = get_font(20)
+
+
+def _render_label_tile(label: str, color: str) -> Tuple[Tuple[int, int], Image.Image]:
+    """
+    Render a result label (white text on its background box) as one opaque tile.
+    
+    Args:
+        label: Label text
+        color: Background color
+        
+    Returns:
+        tuple: (offset, tile)
+        - offset: Position of the tile relative to the text anchor
+        - tile: RGB image of the label box, edges included
+    """
+    left, top, right, bottom = _LABEL_FONT.getbbox(label)
+    tile = Image.new("RGB", (right - left + 1, bottom - top + 1), color)
+    ImageDraw.Draw(tile).text((-left, -top), label, fill="white", font=_LABEL_FONT)
+    return (left, top), tile
+
+
+# The confidence labels are fixed, so each is rendered once and pasted in a single call
+_LABEL_TILES = {
+    label: _render_label_tile(label, _CONFIDENCE_COLORS[label]) for label in _CONFIDENCE_LABELS
+} if _LABEL_FONT else {}
+
+
+def load_rgb_image(fp) -> Image.Image:
+    """
+    Open an image as RGB, converting only when the file is stored in another mode.
+    
+    Args:
+        fp: Path or binary file object, as accepted by Image.open
+        
+    Returns:
+        Fully loaded RGB image
+    """
+    image = Image.open(fp)
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    
+    # Already RGB: decode in place rather than through convert()'s full copy
+    image.load()
+    return image
+
+
+def _run_sync(coro):
+    """
+    Run a coroutine to completion on this thread's event loop.
+    
+    Uses the same loop as the agent's run_sync calls, so the HTTP client the
+    model provider caches stays bound to a single loop.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
 def categorize_confidence(raw_score: float) -> str:
     """
     Convert raw confidence percentage to categorical confidence.
@@ -14,214 +108,588 @@ def categorize_confidence(raw_score: float) -> str:
     Returns:
         Categorical confidence string
     """
-    if raw_score >= 90:
-        return "certain"
-    elif raw_score >= 75:
-        return "high"
-    elif raw_score >= 60:
-        return "medium"
-    elif raw_score >= 45:
-        return "low"
-    else:
-        return "uncertain"
+    # bisect_right puts a score equal to a threshold in the category that threshold starts
+    return _CONFIDENCE_LABELS[bisect.bisect_right(_CONFIDENCE_THRESHOLDS, raw_score)]
 
 
 class SimpleSpatialDetector:
     """Main spatial detection class using recursive grid analysis."""
     
-    def __init__(self, ai_agent: SimpleAIAgent):
+    def __init__(self, ai_agent: SimpleAIAgent, max_dim: int = 1024, max_workers: int = 8, speculative: bool = False, min_cell_area: int = 256 * 256):
         """
         Initialize the spatial detector.
         
         Args:
             ai_agent: Configured SimpleAIAgent instance
+            max_dim: Longest side, in pixels, of the image the grid search runs on
+            max_workers: Most objects detect_multiple searches for at the same time
+            speculative: Send a finer 8x6 grid along with each 4x3 grid, so one AI call
+                can advance the search by two crops (more image tokens per call)
+            min_cell_area: Stop cropping once the AI picks a single cell smaller than this
+                many original image pixels
         """
         self.agent = ai_agent
         self.max_crops = 4
         self.convergence_threshold = 0.05  # Stop when crop is 5% of original (much more focused)
+        self.max_dim = max_dim
+        self.max_workers = max_workers
+        self.speculative = speculative
+        self.min_cell_area = min_cell_area
         
-    def detect(self, image_path: str, object_description: str) -> Dict:
+        # Per-object runs of detect_multiple share one result path, so writes must not interleave
+        self._save_lock = threading.Lock()
+        
+        # Outcomes of recent searches, keyed by (search image digest, original size, normalized
+        # description), so repeated queries on the same image skip the AI entirely
+        self._result_cache: OrderedDict[Tuple[bytes, Tuple[int, int], str], Dict] = OrderedDict()
+        self._result_cache_size = 256
+        self._result_cache_lock = threading.Lock()
+        
+    def detect(self, image_path: str, object_description: str, initial_response: Optional[Dict] = None, save_result: bool = True) -> Dict:
         """
         Detect object in image using recursive grid analysis.
         
         Args:
             image_path: Path to input image
             object_description: Description of object to detect
+            initial_response: Precomputed AI response for the 4x3 grid on the full image,
+                used instead of the first analyze_grid call (see detect_multiple)
+            save_result: Write the result image next to the input (in the background)
+            
+        Returns:
+            Dict containing detection results
+        """
+        # The freshly loaded image is ours, so the result can be drawn on it directly
+        image = load_rgb_image(image_path)
+        return self.detect_image(image, object_description, initial_response, image_path if save_result else None, inplace=True)
+    
+    def detect_image(self, image: Image.Image, object_description: str, initial_response: Optional[Dict] = None, image_path: Optional[str] = None, inplace: bool = False, search_image: Optional[Image.Image] = None, search_digest: Optional[bytes] = None) -> Dict:
+        """
+        Detect object in an already loaded image.
+        
+        Args:
+            image: RGB input image
+            object_description: Description of object to detect
+            initial_response: Precomputed AI response for the 4x3 grid on the full image
+            image_path: Path the image was loaded from, used to name the saved result image.
+                Nothing is written to disk when None.
+            inplace: Draw the result on image itself instead of a copy
+            search_image: The image already downscaled by _to_search_image, when the caller has one
+            search_digest: SHA-1 digest of search_image's pixels, when the caller has one
+            
+        Returns:
+            Dict containing detection results
+        """
+        steps = self._detection_steps(image, object_description, initial_response, image_path, inplace, search_image, search_digest)
+        try:
+            grid_images = next(steps)
+            while True:
+                try:
+                    if len(grid_images) == 1:
+                        ai_responses = [self.agent.analyze_grid(grid_images[0], object_description)]
+                    else:
+                        ai_responses = self.agent.analyze_grids(grid_images, object_description)
+                except Exception as e:
+                    grid_images = steps.throw(e)
+                else:
+                    grid_images = steps.send(ai_responses)
+        except StopIteration as stop:
+            return stop.value
+    
+    async def detect_async(self, image_path: str, object_description: str, initial_response: Optional[Dict] = None, save_result: bool = True) -> Dict:
+        """
+        Async variant of detect that awaits the AI analysis instead of blocking on it.
+        
+        Args:
+            image_path: Path to input image
+            object_description: Description of object to detect
+            initial_response: Precomputed AI response for the 4x3 grid on the full image
+            save_result: Write the result image next to the input (in the background)
             
         Returns:
             Dict containing detection results
         """
-        # 1. Load image
-        image = Image.open(image_path).convert("RGB")
-        original_image = image.copy()  # Keep reference for coordinate restoration
+        # Decode off the event loop
+        image = await asyncio.to_thread(load_rgb_image, image_path)
+        return await self.detect_image_async(image, object_description, initial_response, image_path if save_result else None, inplace=True)
+    
+    async def detect_image_async(self, image: Image.Image, object_description: str, initial_response: Optional[Dict] = None, image_path: Optional[str] = None, inplace: bool = False, search_image: Optional[Image.Image] = None, search_digest: Optional[bytes] = None) -> Dict:
+        """
+        Async variant of detect_image.
+        
+        Args:
+            image: RGB input image
+            object_description: Description of object to detect
+            initial_response: Precomputed AI response for the 4x3 grid on the full image
+            image_path: Path the image was loaded from, used to name the saved result image.
+                Nothing is written to disk when None.
+            inplace: Draw the result on image itself instead of a copy
+            search_image: The image already downscaled by _to_search_image, when the caller has one
+            search_digest: SHA-1 digest of search_image's pixels, when the caller has one
+            
+        Returns:
+            Dict containing detection results
+        """
+        steps = self._detection_steps(image, object_description, initial_response, image_path, inplace, search_image, search_digest)
+        try:
+            grid_images = next(steps)
+            while True:
+                try:
+                    if len(grid_images) == 1:
+                        ai_responses = [await self.agent.analyze_grid_async(grid_images[0], object_description)]
+                    else:
+                        ai_responses = await self.agent.analyze_grids_async(grid_images, object_description)
+                except Exception as e:
+                    grid_images = steps.throw(e)
+                else:
+                    grid_images = steps.send(ai_responses)
+        except StopIteration as stop:
+            return stop.value
+    
+    def _detection_steps(self, original_image: Image.Image, object_description: str, initial_response: Optional[Dict] = None, image_path: Optional[str] = None, inplace: bool = False, search_image: Optional[Image.Image] = None, search_digest: Optional[bytes] = None) -> Generator[List[Image.Image], List[Dict], Dict]:
+        """
+        Detection shared by detect_image and detect_image_async.
+        
+        Yields the grid images that need AI analysis (one, or a coarse and a fine
+        grid in speculative mode) and receives one response per image (or the
+        raised exception) back from the caller, so the same search runs with
+        either blocking or awaited AI calls.
+        
+        Args:
+            original_image: RGB input image
+            object_description: Description of object to detect
+            initial_response: Precomputed AI response for the 4x3 grid on the full image
+            image_path: Path the image was loaded from; the result image is saved next to it when set
+            inplace: Draw the result on original_image itself instead of a copy
+            search_image: original_image already downscaled by _to_search_image; computed here when None
+            search_digest: SHA-1 digest of search_image's pixels; computed here when None
+            
+        Returns:
+            Dict containing detection results
+        """
+        # 1. Reuse the outcome of an earlier search on the same pixels for the same object
+        if search_image is None:
+            search_image = self._to_search_image(original_image)
+        if search_digest is None:
+            search_digest = hashlib.sha1(search_image.tobytes()).digest()
+        key = self._result_key(search_digest, original_image, object_description)
+        detection = self._get_cached_detection(key)
+        
+        # 2. Otherwise run the grid search
+        if detection is None:
+            detection, cacheable = yield from self._search_steps(original_image, search_image, object_description, initial_response)
+            if cacheable:
+                self._cache_detection(key, detection)
+        
+        # 3. Handle case where no object is detected
+        if detection["bbox"] is None:
+            return {
+                "bbox": (0, 0, 0, 0),
+                "confidence": "uncertain",
+                "confidence_score": 0,
+                "iterations": detection["iterations"],
+                "result_image_path": None,
+                "result_image": original_image
+            }
+        
+        # 4. Create visualization and save it
+        result_image = self._draw_bbox_on_original(original_image, detection["bbox"], detection["confidence"], inplace)
+        output_path = None
+        if image_path:
+            output_path = self._result_path(image_path, '_detected')
+            self._save_in_background(result_image, output_path)
+        
+        return {
+            **detection,
+            "result_image_path": output_path,
+            "result_image": result_image
+        }
+    
+    def _result_key(self, search_digest: bytes, original_image: Image.Image, object_description: str) -> Tuple[bytes, Tuple[int, int], str]:
+        """
+        Build the result cache key for one object in one image.
+        
+        Args:
+            search_digest: SHA-1 digest of the search image's pixels
+            original_image: RGB input image
+            object_description: Description of object to detect
+            
+        Returns:
+            Tuple of the digest, the original size and the normalized description
+        """
+        # The cached bbox is in original image coordinates, so the original size is part of the key
+        return search_digest, original_image.size, " ".join(object_description.lower().split())
+    
+    def _get_cached_detection(self, key: Tuple[bytes, Tuple[int, int], str]) -> Optional[Dict]:
+        """
+        Look up an earlier search outcome, marking it as recently used.
+        
+        Args:
+            key: Key from _result_key
+            
+        Returns:
+            The cached detection, or None if not cached
+        """
+        with self._result_cache_lock:
+            detection = self._result_cache.get(key)
+            if detection is not None:
+                self._result_cache.move_to_end(key)
+        return detection
+    
+    def _cache_detection(self, key: Tuple[bytes, Tuple[int, int], str], detection: Dict) -> None:
+        """
+        Store a search outcome, evicting the least recently used one when full.
+        
+        Args:
+            key: Key from _result_key
+            detection: Dict with 'bbox', 'confidence', 'confidence_score' and 'iterations'
+        """
+        with self._result_cache_lock:
+            self._result_cache[key] = detection
+            while len(self._result_cache) > self._result_cache_size:
+                self._result_cache.popitem(last=False)
+    
+    def _search_steps(self, original_image: Image.Image, search_image: Image.Image, object_description: str, initial_response: Optional[Dict] = None) -> Generator[List[Image.Image], List[Dict], Tuple[Dict, bool]]:
+        """
+        Recursive grid search, yielding grid images and receiving responses like _detection_steps.
+        
+        Args:
+            original_image: RGB input image
+            search_image: original_image downscaled to max_dim
+            object_description: Description of object to detect
+            initial_response: Precomputed AI response for the 4x3 grid on the full image
+            
+        Returns:
+            tuple: (detection, cacheable)
+            - detection: Dict with 'bbox' (None when nothing was found), 'confidence',
+              'confidence_score' and 'iterations'
+            - cacheable: False when the result is a fallback after a failed AI call
+        """
+        # 1. Start from the downscaled copy
+        image = search_image
         
         # 2. Initialize tracking variables
-        origin_coordinates = (0, 0)  # Cumulative offset from original image
+        region = (0, 0, original_image.width, original_image.height)  # Current crop, in original image coordinates
         iterations = 0
+        grid_image = None  # Grid overlay of the current image, if one was drawn
+        
+        # Crops smaller than this are focused enough (area ratio below convergence_threshold)
+        min_area = self.convergence_threshold * original_image.width * original_image.height
+        
+        # Last response that led to a crop, and whether the search ended by converging
+        # (rather than the AI finding nothing or failing)
+        last_response = None
+        converged = False
+        
+        # Results that fall back after a failed AI call are not worth remembering
+        cacheable = True
         
         # 3. Iterative cropping loop
         while iterations < self.max_crops:
-            # a. Check terminal condition (image too small or convergence)
-            if self._is_terminal_state(image, original_image):
+            # a. Stop if the crop gets too small or very focused (in original pixels, since
+            # the image sent to the AI may be downscaled)
+            region_width, region_height = region[2] - region[0], region[3] - region[1]
+            if region_width < _MIN_CROP_SIDE or region_height < _MIN_CROP_SIDE or region_width * region_height < min_area:
+                converged = True
                 break
                 
-            # b. Overlay 4x3 grid on current image
-            grid_image, cell_mapping = overlay_grid_on_image(image, 4, 3)
+            # b. Speculative mode: also overlay a finer 8x6 grid, on a copy since the
+            # coarse grid below is drawn on the image itself
+            fine_grid_image = None
+            if self.speculative and initial_response is None and iterations + 1 < self.max_crops:
+                fine_grid_image, fine_cell_mapping = overlay_grid_on_image(image, 8, 6)
+            
+            # Overlay 4x3 grid on current image. Crops are scratch images owned by this
+            # loop (later crops come from the search image), so draw on them directly
+            grid_image, cell_mapping = overlay_grid_on_image(image, 4, 3, inplace=image is not search_image)
             
             # c. AI analysis: get cells containing object
             try:
-                ai_response = self.agent.analyze_grid(grid_image, object_description)
+                fine_response = None
+                if initial_response is not None:
+                    ai_response, initial_response = initial_response, None
+                elif fine_grid_image is not None:
+                    ai_response, fine_response = yield [grid_image, fine_grid_image]
+                else:
+                    [ai_response] = yield [grid_image]
                 
-                # d. Check if AI found any confident cells
+                # d. Check if AI found any confident cells (ids outside the grid do not count)
+                ai_response = self._in_grid(ai_response, cell_mapping)
+                if fine_response is not None:
+                    fine_response = self._in_grid(fine_response, fine_cell_mapping)
                 if not ai_response['cells']:
                     break
             except Exception as e:
+                cacheable = False
                 break
             
             # e. Filter to only highest confidence cells for more focused cropping
-            if ai_response['cells'] and ai_response['confidence_scores']:
-                # Get only cells with confidence >= 80% for more focused cropping
-                high_conf_cells = []
-                for cell, conf in zip(ai_response['cells'], ai_response['confidence_scores']):
-                    if conf >= 80:
-                        high_conf_cells.append(cell)
-                
-                # If we have high confidence cells, use those, otherwise use all
-                cells_to_use = high_conf_cells if high_conf_cells else ai_response['cells']
-            else:
-                cells_to_use = ai_response['cells']
-            
-            crop_bbox = self._cells_to_bbox(cells_to_use, cell_mapping)
+            crop_bbox = self._cells_to_bbox(self._focus_cells(ai_response), cell_mapping)
             
-            # f. Crop image to that region
-            image = image.crop(crop_bbox)
+            # Speculative step: a fine selection that agrees with the coarse crop stands in
+            # for the next iteration's answer, saving its AI call. The two grids' cell edges
+            # round differently, so agreement means most of the fine box lies in the crop.
+            if fine_response and fine_response['cells']:
+                fine_bbox = self._cells_to_bbox(self._focus_cells(fine_response), fine_cell_mapping)
+                overlap = (
+                    max(fine_bbox[0], crop_bbox[0]),
+                    max(fine_bbox[1], crop_bbox[1]),
+                    min(fine_bbox[2], crop_bbox[2]),
+                    min(fine_bbox[3], crop_bbox[3])
+                )
+                overlap_area = max(0, overlap[2] - overlap[0]) * max(0, overlap[3] - overlap[1])
+                fine_area = (fine_bbox[2] - fine_bbox[0]) * (fine_bbox[3] - fine_bbox[1])
+                if overlap_area * 2 >= fine_area > 0 and overlap != crop_bbox:
+                    crop_bbox = overlap
+                    iterations += 1
             
-            # g. Update cumulative coordinate offset
-            origin_coordinates = (
-                origin_coordinates[0] + crop_bbox[0],
-                origin_coordinates[1] + crop_bbox[1]
+            # f. Narrow the cumulative region to those cells, scaling up from the current image
+            scale_x = region_width / image.width
+            scale_y = region_height / image.height
+            region = (
+                region[0] + round(crop_bbox[0] * scale_x),
+                region[1] + round(crop_bbox[1] * scale_y),
+                region[0] + round(crop_bbox[2] * scale_x),
+                region[1] + round(crop_bbox[3] * scale_y)
             )
             
+            # g. Crop it from the original in one step, so each zoom regains resolution
+            # (the current image has the grid drawn on it), downscaled to max_dim again
+            image = self._to_search_image(original_image.crop(region))
+            grid_image = None
+            last_response = ai_response
+            
             iterations += 1
-        
-        # 4. Final detection on cropped image
-        try:
-            final_grid_image, final_cell_mapping = overlay_grid_on_image(image, 4, 3)
-            final_response = self.agent.analyze_grid(final_grid_image, object_description)
-        except Exception as e:
-            # Return current image bounds as fallback
-            final_response = {'cells': [5, 6, 8, 9], 'confidence_scores': [70, 70, 70, 70]}
-            final_cell_mapping = {
-                1: (0, 0, image.width//3, image.height//4),
-                2: (image.width//3, 0, image.width//3, image.height//4),
-                3: (2*image.width//3, 0, image.width//3, image.height//4),
-                4: (0, image.height//4, image.width//3, image.height//4),
-                5: (image.width//3, image.height//4, image.width//3, image.height//4),
-                6: (2*image.width//3, image.height//4, image.width//3, image.height//4),
-                7: (0, 2*image.height//4, image.width//3, image.height//4),
-                8: (image.width//3, 2*image.height//4, image.width//3, image.height//4),
-                9: (2*image.width//3, 2*image.height//4, image.width//3, image.height//4),
-                10: (0, 3*image.height//4, image.width//3, image.height//4),
-                11: (image.width//3, 3*image.height//4, image.width//3, image.height//4),
-                12: (2*image.width//3, 3*image.height//4, image.width//3, image.height//4)
-            }
+            
+            # h. A single small cell has converged: subdividing it again costs an AI call
+            # without adding useful resolution, so go straight to the final detection
+            if len(ai_response['cells']) == 1 and (region[2] - region[0]) * (region[3] - region[1]) < self.min_cell_area:
+                converged = True
+                break
+        else:
+            # Used up max_crops
+            converged = True
+        
+        # 4. Final detection on cropped image. The final grid normally refines the crop to a
+        # few of its cells; only when the crop is already below the size stop on both sides
+        # (so its cells would be tiny) and the AI was confident about it is the crop itself
+        # taken as the answer, skipping that call.
+        if (converged and last_response is not None and last_response['confidence_scores']
+                and fmean(last_response['confidence_scores']) >= 80
+                and region[2] - region[0] < _MIN_CROP_SIDE and region[3] - region[1] < _MIN_CROP_SIDE):
+            final_response = last_response
+            final_cell_mapping = None
+        else:
+            # Reuse the current image's grid overlay if the loop already drew one
+            try:
+                if grid_image is None:
+                    grid_image, cell_mapping = overlay_grid_on_image(image, 4, 3, inplace=image is not search_image)
+                final_grid_image, final_cell_mapping = grid_image, cell_mapping
+                if initial_response is not None:
+                    final_response = initial_response
+                else:
+                    [final_response] = yield [final_grid_image]
+                final_response = self._in_grid(final_response, final_cell_mapping)
+            except Exception as e:
+                # Return current image bounds as fallback
+                cacheable = False
+                final_response = {'cells': [5, 6, 8, 9], 'confidence_scores': [70, 70, 70, 70]}
+                final_cell_mapping = {
+                    1: (0, 0, image.width//3, image.height//4),
+                    2: (image.width//3, 0, image.width//3, image.height//4),
+                    3: (2*image.width//3, 0, image.width//3, image.height//4),
+                    4: (0, image.height//4, image.width//3, image.height//4),
+                    5: (image.width//3, image.height//4, image.width//3, image.height//4),
+                    6: (2*image.width//3, image.height//4, image.width//3, image.height//4),
+                    7: (0, 2*image.height//4, image.width//3, image.height//4),
+                    8: (image.width//3, 2*image.height//4, image.width//3, image.height//4),
+                    9: (2*image.width//3, 2*image.height//4, image.width//3, image.height//4),
+                    10: (0, 3*image.height//4, image.width//3, image.height//4),
+                    11: (image.width//3, 3*image.height//4, image.width//3, image.height//4),
+                    12: (2*image.width//3, 3*image.height//4, image.width//3, image.height//4)
+                }
         
         # 5. Handle case where no object is detected
         if not final_response['cells'] or not final_response['confidence_scores']:
-            return {
-                "bbox": (0, 0, 0, 0),
-                "confidence": "uncertain",
-                "confidence_score": 0,
-                "iterations": iterations,
-                "result_image_path": None,
-                "result_image": original_image
-            }
+            return {"bbox": None, "confidence": "uncertain", "confidence_score": 0, "iterations": iterations}, cacheable
         
-        # 6. Calculate final bounding box in cropped image space
-        final_bbox_crop = self._cells_to_bbox(final_response['cells'], final_cell_mapping)
+        # 6. Calculate final bounding box in cropped image space (the whole crop when reused)
+        if final_cell_mapping is None:
+            final_bbox_crop = (0, 0, image.width, image.height)
+        else:
+            final_bbox_crop = self._cells_to_bbox(final_response['cells'], final_cell_mapping)
         
-        # 7. Transform back to original image coordinates
+        # 7. Transform back to original image coordinates (undo downscale, then crop offset)
+        scale_x = (region[2] - region[0]) / image.width
+        scale_y = (region[3] - region[1]) / image.height
         final_bbox_original = (
-            final_bbox_crop[0] + origin_coordinates[0],
-            final_bbox_crop[1] + origin_coordinates[1], 
-            final_bbox_crop[2] + origin_coordinates[0],
-            final_bbox_crop[3] + origin_coordinates[1]
+            region[0] + round(final_bbox_crop[0] * scale_x),
+            region[1] + round(final_bbox_crop[1] * scale_y),
+            region[0] + round(final_bbox_crop[2] * scale_x),
+            region[1] + round(final_bbox_crop[3] * scale_y)
         )
         
-        # 8. Calculate overall confidence and categorize
-        if final_response.get('confidence_scores') and len(final_response['confidence_scores']) > 0:
-            avg_confidence = sum(final_response['confidence_scores']) / len(final_response['confidence_scores'])
-        else:
-            avg_confidence = 0
+        # 8. Calculate overall confidence and categorize (step 5 guarantees at least one score)
+        avg_confidence = fmean(final_response['confidence_scores'])
         confidence_category = categorize_confidence(avg_confidence)
         
-        # 9. Create visualization and save it
-        result_image = self._draw_bbox_on_original(original_image, final_bbox_original, confidence_category)
-        output_path = image_path.replace('.', '_detected.')
-        result_image.save(output_path)
-        
         return {
             "bbox": final_bbox_original,
             "confidence": confidence_category,
             "confidence_score": avg_confidence,
-            "iterations": iterations,
-            "result_image_path": output_path,
-            "result_image": result_image
-        }
+            "iterations": iterations
+        }, cacheable
     
-    def _is_terminal_state(self, current_image: Image.Image, original_image: Image.Image) -> bool:
+    def _to_search_image(self, image: Image.Image) -> Image.Image:
         """
-        Check if we should stop cropping.
+        Downscale an image so its longest side is at most max_dim.
+        
+        Grid-cell accuracy does not improve past this size, while every extra
+        pixel costs vision tokens, encode time and upload bytes.
         
         Args:
-            current_image: Current cropped image
-            original_image: Original input image
+            image: Full-resolution input image, or a crop of it
             
         Returns:
-            True if we should stop cropping
+            The downscaled image, or the input itself if it is already small enough
+        """
+        longest = max(image.width, image.height)
+        if longest <= self.max_dim:
+            return image
+        
+        # Box-reduce to within 2x of the target, then bilinear: about 3x faster than a
+        # full LANCZOS pass and indistinguishable at grid-cell resolution
+        ratio = self.max_dim / longest
+        size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+        return image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+    
+    def _focus_cells(self, ai_response: Dict) -> List[int]:
         """
-        # Calculate area ratio between current crop and original image
-        current_area = current_image.width * current_image.height
-        original_area = original_image.width * original_image.height
-        area_ratio = current_area / original_area
+        Pick the cells to crop to: the high-confidence ones when there are any.
         
-        # Stop if image gets too small OR if area ratio gets very small
-        min_size_reached = (current_image.width < 200 or current_image.height < 200)
-        very_focused = (area_ratio < self.convergence_threshold)
+        Args:
+            ai_response: Dict with 'cells' and 'confidence_scores' lists
+            
+        Returns:
+            Cell IDs to crop to
+        """
+        if ai_response['cells'] and ai_response['confidence_scores']:
+            # Get only cells with confidence >= 80% for more focused cropping
+            high_conf_cells = [
+                cell for cell, conf in zip(ai_response['cells'], ai_response['confidence_scores'])
+                if conf >= 80
+            ]
+            
+            # If we have high confidence cells, use those, otherwise use all
+            if high_conf_cells:
+                return high_conf_cells
+        return ai_response['cells']
+    
+    def _in_grid(self, ai_response: Dict, cell_mapping: Dict[int, Tuple[int, int, int, int]]) -> Dict:
+        """
+        Drop cells the grid does not have (the model's cell ids are not range-checked).
         
-        return min_size_reached or very_focused
+        Args:
+            ai_response: Dict with 'cells' and 'confidence_scores' lists
+            cell_mapping: Mapping from cell ID to (x, y, width, height)
+            
+        Returns:
+            Dict with the in-grid cells and their confidence scores
+        """
+        cells, scores = ai_response['cells'], ai_response['confidence_scores']
+        keep = [i for i, cell in enumerate(cells) if cell in cell_mapping]
+        if len(keep) == len(cells):
+            return ai_response
+        return {
+            'cells': [cells[i] for i in keep],
+            'confidence_scores': [scores[i] for i in keep if i < len(scores)]
+        }
     
     def _cells_to_bbox(self, cell_ids: List[int], cell_mapping: Dict[int, Tuple[int, int, int, int]]) -> Tuple[int, int, int, int]:
         """
         Convert selected cells to bounding box coordinates.
         
         Args:
-            cell_ids: List of selected cell IDs
+            cell_ids: Non-empty list of selected cell IDs, all in cell_mapping (see _in_grid)
             cell_mapping: Mapping from cell ID to (x, y, width, height)
             
         Returns:
             Bounding box as (left, top, right, bottom)
         """
-        if not cell_ids:
-            return (0, 0, 0, 0)
+        # Find minimum x, y and maximum x+width, y+height across all selected cells,
+        # starting from the first selected cell (one lookup per cell)
+        bbox = None
+        for cell_id in cell_ids:
+            x, y, width, height = cell_mapping[cell_id]
+            if bbox is None:
+                bbox = [x, y, x + width, y + height]
+                continue
+            if x < bbox[0]:
+                bbox[0] = x
+            if y < bbox[1]:
+                bbox[1] = y
+            if x + width > bbox[2]:
+                bbox[2] = x + width
+            if y + height > bbox[3]:
+                bbox[3] = y + height
+        
+        return tuple(bbox)
+    
+    def _result_path(self, image_path: str, suffix: str) -> str:
+        """
+        Name a result image after its input, e.g. photo.v2.jpg -> photo.v2_detected.jpg.
         
-        # Find minimum x, y and maximum x+width, y+height across all selected cells
-        min_x = float('inf')
-        min_y = float('inf')
-        max_x = 0
-        max_y = 0
+        Args:
+            image_path: Path to input image
+            suffix: Text appended to the file stem
+            
+        Returns:
+            Path of the result image
+        """
+        path = Path(image_path)
+        return str(path.with_stem(path.stem + suffix))
+    
+    def _save_in_background(self, image: Image.Image, output_path: str) -> None:
+        """
+        Write a result image on the save pool so detection can return before encoding finishes.
         
-        for cell_id in cell_ids:
-            if cell_id in cell_mapping:
-                x, y, width, height = cell_mapping[cell_id]
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x + width)
-                max_y = max(max_y, y + height)
-        
-        return (int(min_x), int(min_y), int(max_x), int(max_y))
+        Args:
+            image: Finished result image, not modified afterwards
+            output_path: Where to write it
+        """
+        def save():
+            with self._save_lock:
+                image.save(output_path, optimize=False)
+        
+        # Nobody waits on the future, so report failures (bad extension, permissions) here
+        def report(future):
+            if (error := future.exception()) is not None:
+                print(f"Failed to save result image to {output_path}: {error}")
+        
+        _SAVE_POOL.submit(save).add_done_callback(report)
     
-    def _draw_bbox_on_original(self, image: Image.Image, bbox: Tuple[int, int, int, int], confidence_category: str) -> Image.Image:
+    def _draw_outline(self, image: Image.Image, draw: ImageDraw.ImageDraw, bbox: Tuple[int, int, int, int], color: str, width: int = 3) -> None:
+        """
+        Draw a rectangle outline as four solid stripes, matching draw.rectangle(bbox, outline=color, width=width).
+        
+        Args:
+            image: Image to draw on
+            draw: Drawing context for image, used for boxes too thin to have an inside
+            bbox: Box as inclusive (left, top, right, bottom)
+            color: Outline color
+            width: Outline width in pixels
+        """
+        x0, y0, x1, y1 = bbox
+        if x1 - x0 < 2 * width - 1 or y1 - y0 < 2 * width - 1:
+            draw.rectangle(bbox, outline=color, width=width)
+            return
+        
+        image.paste(color, (x0, y0, x1 + 1, y0 + width))
+        image.paste(color, (x0, y1 - width + 1, x1 + 1, y1 + 1))
+        image.paste(color, (x0, y0, x0 + width, y1 + 1))
+        image.paste(color, (x1 - width + 1, y0, x1 + 1, y1 + 1))
+    
+    def _draw_bbox_on_original(self, image: Image.Image, bbox: Tuple[int, int, int, int], confidence_category: str, inplace: bool = False) -> Image.Image:
         """
         Draw bounding box on original image for visualization.
         
@@ -229,42 +697,31 @@ class SimpleSpatialDetector:
             image: Original image
             bbox: Bounding box as (left, top, right, bottom)
             confidence_category: Confidence category string
+            inplace: Draw on image itself when the caller does not need the pristine original
             
         Returns:
             Image with bbox and label drawn
         """
-        result_image = image.copy()
+        result_image = image if inplace else image.copy()
         draw = ImageDraw.Draw(result_image)
         
         # Choose color based on confidence
-        color_map = {
-            "certain": "green",
-            "high": "blue",
-            "medium": "orange",
-            "low": "yellow",
-            "uncertain": "red"
-        }
-        color = color_map.get(confidence_category, "red")
+        color = _CONFIDENCE_COLORS.get(confidence_category, "red")
         
         # Draw bounding box
-        draw.rectangle(bbox, outline=color, width=3)
+        self._draw_outline(result_image, draw, bbox, color)
         
         # Add confidence label
         label = f"{confidence_category}"
         label_x, label_y = bbox[0], max(0, bbox[1] - 25)
         
-        try:
-            # Try to use a system font
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 20)
-        except:
-            # Fall back to default font
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
+        font = _LABEL_FONT
         
-        # Draw label background
-        if font:
+        # Draw label background and text, pasting the prerendered tile when the label is a known one
+        if label in _LABEL_TILES:
+            (left, top), tile = _LABEL_TILES[label]
+            result_image.paste(tile, (label_x + left, label_y + top))
+        elif font:
             bbox_text = draw.textbbox((label_x, label_y), label, font=font)
             draw.rectangle(bbox_text, fill=color)
             draw.text((label_x, label_y), label, fill="white", font=font)
@@ -273,41 +730,135 @@ class SimpleSpatialDetector:
         
         return result_image
     
-    def detect_multiple(self, image_path: str, object_descriptions: List[str]) -> List[Dict]:
+    def detect_multiple(self, image_path: str, object_descriptions: List[str], save_result: bool = True) -> List[Dict]:
         """
         Detect multiple objects in an image using multiple single-object runs.
         
+        The first grid analysis is identical for every object, so it is done once
+        for all objects with a single batched AI request and fanned out to each run.
+        
         Args:
             image_path: Path to input image
             object_descriptions: List of object descriptions to detect
+            save_result: Write the result images next to the input (in the background)
             
         Returns:
             List of detection results, each containing object name, bounding box, and confidence
         """
-        # 1. Load original image once
-        original_image = Image.open(image_path).convert("RGB")
+        # Load original image once
+        original_image = load_rgb_image(image_path)
+        return self.detect_multiple_image(original_image, object_descriptions, image_path if save_result else None)
+    
+    def detect_multiple_image(self, image: Image.Image, object_descriptions: List[str], image_path: Optional[str] = None) -> List[Dict]:
+        """
+        Detect multiple objects in an already loaded image.
         
-        # 2. Run single detection for each object
-        detections = []
-        for i, obj_desc in enumerate(object_descriptions):
-            print(f"Detecting object {i+1}/{len(object_descriptions)}: {obj_desc}")
-            detection = self.detect(image_path, obj_desc)
+        Args:
+            image: RGB input image
+            object_descriptions: List of object descriptions to detect
+            image_path: Path the image was loaded from, used to name saved result images.
+                Nothing is written to disk when None.
+            
+        Returns:
+            List of detection results, each containing object name, bounding box, and confidence
+        """
+        # The per-object runs spend their time waiting on the AI, so overlap them on an event
+        # loop. Not threads: the agent's HTTP client is bound to a single event loop.
+        return _run_sync(self.detect_multiple_image_async(image, object_descriptions, image_path))
+    
+    async def detect_multiple_async(self, image_path: str, object_descriptions: List[str], save_result: bool = True) -> List[Dict]:
+        """
+        Async variant of detect_multiple that runs the per-object searches concurrently.
+        
+        Args:
+            image_path: Path to input image
+            object_descriptions: List of object descriptions to detect
+            save_result: Write the result images next to the input (in the background)
+            
+        Returns:
+            List of detection results, each containing object name, bounding box, and confidence
+        """
+        original_image = await asyncio.to_thread(load_rgb_image, image_path)
+        return await self.detect_multiple_image_async(original_image, object_descriptions, image_path if save_result else None)
+    
+    async def detect_multiple_image_async(self, image: Image.Image, object_descriptions: List[str], image_path: Optional[str] = None) -> List[Dict]:
+        """
+        Async variant of detect_multiple_image that runs the per-object searches concurrently.
+        
+        Args:
+            image: RGB input image
+            object_descriptions: List of object descriptions to detect
+            image_path: Path the image was loaded from, used to name saved result images.
+                Nothing is written to disk when None.
             
-            # 3. Add object identifier to result
+        Returns:
+            List of detection results, each containing object name, bounding box, and confidence
+        """
+        # 1. Analyze the full-image grid in one request for the objects not already cached.
+        # The input is downscaled and hashed once here and handed to every per-object run
+        search_image = self._to_search_image(image)
+        search_digest = hashlib.sha1(search_image.tobytes()).digest()
+        uncached = [
+            desc for desc in object_descriptions
+            if self._get_cached_detection(self._result_key(search_digest, image, desc)) is None
+        ]
+        initial_responses = {}
+        if uncached:
+            try:
+                # Copy for the grid: the per-object runs reuse this search image
+                grid_image, _ = overlay_grid_on_image(search_image, 4, 3)
+                initial_responses = await self.agent.analyze_grid_multi_async(grid_image, uncached)
+            except Exception:
+                # Fall back to per-object analysis inside detect_image_async()
+                initial_responses = {}
+        
+        # 2. Overlap the per-object AI round-trips instead of running them back to back,
+        # with at most max_workers searches in flight
+        semaphore = asyncio.Semaphore(max(1, self.max_workers))
+        
+        async def detect_one(i: int, obj_desc: str) -> Dict:
+            async with semaphore:
+                print(f"Detecting object {i+1}/{len(object_descriptions)}: {obj_desc}")
+                return await self.detect_image_async(image, obj_desc, initial_responses.get(obj_desc), image_path, search_image=search_image, search_digest=search_digest)
+        
+        results = await asyncio.gather(*(
+            detect_one(i, obj_desc) for i, obj_desc in enumerate(object_descriptions)
+        ))
+        
+        return self._combine_detections(image, object_descriptions, results, image_path)
+    
+    def _combine_detections(self, original_image: Image.Image, object_descriptions: List[str], results: List[Dict], image_path: Optional[str] = None) -> List[Dict]:
+        """
+        Label per-object results, drop unconfident ones and draw the combined visualization.
+        
+        Args:
+            original_image: Loaded input image
+            object_descriptions: List of object descriptions, in the same order as results
+            results: Single-object detection results
+            image_path: Path the image was loaded from; the combined image is saved next to it when set
+            
+        Returns:
+            List of confident detection results
+        """
+        detections = []
+        for i, (obj_desc, detection) in enumerate(zip(object_descriptions, results)):
+            # 1. Add object identifier to result
             detection["object"] = obj_desc
             detection["detection_id"] = i
             
-            # 4. Only include confident detections to reduce false positives
+            # 2. Only include confident detections to reduce false positives
             if detection["confidence"] not in ["uncertain", "low"]:
                 detections.append(detection)
         
-        # 5. Create combined visualization image
+        # 3. Create combined visualization image
         if detections:
             combined_result_image = self._draw_multiple_bboxes_on_original(
                 original_image, detections
             )
-            combined_output_path = image_path.replace('.', '_multi_detected.')
-            combined_result_image.save(combined_output_path)
+            combined_output_path = None
+            if image_path:
+                combined_output_path = self._result_path(image_path, '_multi_detected')
+                self._save_in_background(combined_result_image, combined_output_path)
             
             # Add combined visualization to all detections
             for detection in detections:
@@ -333,15 +884,7 @@ class SimpleSpatialDetector:
         # Color palette for different objects
         colors = ["green", "blue", "red", "orange", "purple", "brown", "pink", "gray"]
         
-        try:
-            # Try to use a system font
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 18)
-        except:
-            # Fall back to default font
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
+        font = get_font(18)
         
         label_y_offset = 0  # To stagger labels vertically
         
@@ -354,7 +897,7 @@ class SimpleSpatialDetector:
             color = colors[i % len(colors)]
             
             # Draw bounding box
-            draw.rectangle(bbox, outline=color, width=3)
+            self._draw_outline(result_image, draw, bbox, color)
             
             # Create label with object name and confidence
             label = f"{obj_name} ({confidence})"
@@ -1,12 +1,14 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
+import aiofiles
 import asyncio
+import httpx
 import os
-import shutil
 import uuid
 from pathlib import Path
 
@@ -16,6 +18,10 @@ from ai_agent import SimpleAIAgent
 # Global detector instance
 detector = None
 
+# Keep-alive pool for OpenAI: concurrent detections share warm connections
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=64)
+OPENAI_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """Initialize detector on startup"""
@@ -25,7 +31,9 @@ async def lifespan(_app: FastAPI):
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY environment variable is required")
         
-        agent = SimpleAIAgent(api_key)
+        # One pooled client for every OpenAI request made by this process
+        http_client = httpx.AsyncClient(limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT)
+        agent = SimpleAIAgent(api_key, http_client=http_client)
         detector = SimpleSpatialDetector(agent)
         print("✅ Vision detection API initialized successfully")
     except Exception as e:
@@ -33,9 +41,9 @@ async def lifespan(_app: FastAPI):
         raise
     
     yield
-    # Cleanup on shutdown if needed
+    await http_client.aclose()
 
-app = FastAPI(title="Vision Detection API", version="1.0.0", lifespan=lifespan)
+app = FastAPI(title="Vision Detection API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -50,6 +58,9 @@ app.add_middleware(
 UPLOADS_DIR = Path("uploads")
 UPLOADS_DIR.mkdir(exist_ok=True)
 
+# Size of each read when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 # Mount static files
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
@@ -90,13 +101,14 @@ async def detect_objects(file: UploadFile = File(...), targets: str = Form(...))
     temp_path = UPLOADS_DIR / temp_filename
     
     try:
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream the upload to disk in chunks without blocking the event loop
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
         
-        # Use existing detect_multiple function - handles single and multi-object detection
-        # Run in thread pool to avoid blocking the event loop
-        loop = asyncio.get_event_loop()
-        detections = await loop.run_in_executor(None, detector.detect_multiple, str(temp_path), target_list)
+        # Async detect_multiple - handles single and multi-object detection,
+        # overlapping the per-target AI calls on the event loop
+        detections = await detector.detect_multiple_async(str(temp_path), target_list, save_result=False)
         
         # Convert to API format
         api_results = [
@@ -104,18 +116,18 @@ async def detect_objects(file: UploadFile = File(...), targets: str = Form(...))
                 object=d["object"],
                 confidence=d["confidence"], 
                 confidence_score=d["confidence_score"],
-                bbox=[int(x) for x in d["bbox"]]
+                bbox=d["bbox"]  # already (left, top, right, bottom) ints from the detector
             ) for d in detections
         ]
         
         # Use combined result image if available, otherwise original
-        result_image_path = (detections[0].get("combined_result_image_path") 
-                           if detections else None)
+        result_image = detections[0].get("combined_result_image") if detections else None
         
-        if result_image_path and os.path.exists(result_image_path):
+        if result_image is not None:
             result_filename = f"{uuid.uuid4()}_result{file_extension}"
             result_path = UPLOADS_DIR / result_filename
-            shutil.copy2(result_image_path, result_path)
+            # Write the combined image straight to its served name, off the event loop
+            await asyncio.to_thread(result_image.save, result_path)
             image_url = f"/uploads/{result_filename}"
             temp_path.unlink()  # Clean up original
         else:
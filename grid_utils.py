@@ -1,8 +1,108 @@
 from PIL import Image, ImageDraw, ImageFont
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+import functools
 
 
-def overlay_grid_on_image(image: Image.Image, rows: int = 4, cols: int = 3) -> Tuple[Image.Image, Dict[int, Tuple[int, int, int, int]]]:
+@functools.lru_cache(maxsize=16)
+def get_font(size: int) -> Optional[ImageFont.ImageFont]:
+    """
+    Load the label font once per size and reuse it across calls (also used for the
+    detector's result labels).
+    
+    Args:
+        size: Font size in points
+        
+    Returns:
+        Loaded font, or None if no font is available
+    """
+    try:
+        # Try to use a system font
+        return ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", size)
+    except:
+        # Fall back to default font
+        try:
+            return ImageFont.load_default()
+        except:
+            return None
+
+
+@functools.lru_cache(maxsize=256)
+def _label_tile(label: str, font_size: int) -> Tuple[Tuple[int, int], Image.Image]:
+    """
+    Render a cell label once as a coverage mask.
+    
+    Args:
+        label: Label text
+        font_size: Font size in points
+        
+    Returns:
+        tuple: (offset, mask)
+        - offset: Position of the mask relative to the text anchor
+        - mask: "L" image holding the text coverage
+    """
+    font = get_font(font_size)
+    left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), label, font=font)
+    mask = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), label, fill=255, font=font)
+    return (left, top), mask
+
+
+@functools.lru_cache(maxsize=64)
+def _grid_template(width: int, height: int, rows: int, cols: int) -> Tuple[Dict[int, Tuple[int, int, int, int]], List[Tuple[int, int, int, int]], List[Tuple[Tuple[int, int], Image.Image]]]:
+    """
+    Lay out the grid for one image size, so repeated sizes skip the layout and text rendering.
+    
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        rows: Number of rows in grid
+        cols: Number of columns in grid
+        
+    Returns:
+        tuple: (cell_mapping, stripes, labels)
+        - cell_mapping: Dict mapping cell_id to (x, y, width, height)
+        - stripes: Boxes to fill red for the grid lines
+        - labels: (position, mask) for each cell number
+    """
+    # Calculate cell dimensions
+    cell_width = width // cols
+    cell_height = height // rows
+    
+    # Every cell has the same size, so the label font is the same for all of them
+    # Try to use a reasonable font size, minimum 10 to avoid division by zero
+    font_size = max(10, min(cell_width, cell_height) // 8)
+    
+    # Create cell mapping: cell ids run left to right, top to bottom, starting at 1
+    cell_mapping = {
+        row * cols + col + 1: (col * cell_width, row * cell_height, cell_width, cell_height)
+        for row in range(rows)
+        for col in range(cols)
+    }
+    
+    # Grid lines as solid stripes, one fill per line instead of one rectangle per cell.
+    # Stripes reproduce the 2px cell outlines: inner borders are 3px where two outlines meet.
+    stripes = []
+    grid_right = min(cols * cell_width + 1, width)
+    grid_bottom = min(rows * cell_height + 1, height)
+    for col in range(cols + 1):
+        x = col * cell_width
+        x_end = x + 1 if col == cols else x + 2
+        stripes.append((max(0, x - 1), 0, min(x_end, width), grid_bottom))
+    for row in range(rows + 1):
+        y = row * cell_height
+        y_end = y + 1 if row == rows else y + 2
+        stripes.append((0, max(0, y - 1), grid_right, min(y_end, height)))
+    
+    # Cell number labels (top-left corner with small padding)
+    labels = []
+    for cell_id, (x, y, _, _) in cell_mapping.items():
+        (dx, dy), mask = _label_tile(str(cell_id), font_size)
+        labels.append(((x + 5 + dx, y + 5 + dy), mask))
+    
+    return cell_mapping, stripes, labels
+
+
+def overlay_grid_on_image(image: Image.Image, rows: int = 4, cols: int = 3, inplace: bool = False) -> Tuple[Image.Image, Dict[int, Tuple[int, int, int, int]]]:
     """
     Overlay a numbered grid on an image.
     
@@ -10,57 +110,23 @@ def overlay_grid_on_image(image: Image.Image, rows: int = 4, cols: int = 3) -> T
         image: PIL Image to overlay grid on
         rows: Number of rows in grid
         cols: Number of columns in grid
+        inplace: Draw directly on image instead of a copy, for callers that own a scratch image
         
     Returns:
         tuple: (grid_image, cell_mapping)
         - grid_image: Image with grid overlay
         - cell_mapping: Dict mapping cell_id to (x, y, width, height)
     """
-    # Make a copy to avoid modifying original
-    grid_image = image.copy()
-    draw = ImageDraw.Draw(grid_image)
+    # Make a copy to avoid modifying original, unless the caller hands over its own scratch image
+    grid_image = image if inplace else image.copy()
     
-    # Calculate cell dimensions
-    cell_width = image.width // cols
-    cell_height = image.height // rows
+    # Layout and label masks depend only on the size, so they are built once per size
+    cell_mapping, stripes, labels = _grid_template(image.width, image.height, rows, cols)
     
-    # Create cell mapping
-    cell_mapping = {}
-    cell_id = 1
+    for box in stripes:
+        grid_image.paste("red", box)
     
-    # Draw grid lines and add cell numbers
-    for row in range(rows):
-        for col in range(cols):
-            # Calculate cell boundaries
-            x = col * cell_width
-            y = row * cell_height
-            
-            # Store cell mapping
-            cell_mapping[cell_id] = (x, y, cell_width, cell_height)
-            
-            # Draw cell border
-            draw.rectangle([x, y, x + cell_width, y + cell_height], outline="red", width=2)
-            
-            # Add cell number label
-            # Try to use a reasonable font size, minimum 10 to avoid division by zero
-            font_size = max(10, min(cell_width, cell_height) // 8)
-            try:
-                # Try to use a system font
-                font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-            except:
-                # Fall back to default font
-                try:
-                    font = ImageFont.load_default()
-                except:
-                    font = None
-            
-            # Calculate text position (top-left corner with small padding)
-            text_x = x + 5
-            text_y = y + 5
-            
-            # Draw cell number
-            draw.text((text_x, text_y), str(cell_id), fill="red", font=font)
-            
-            cell_id += 1
+    for (x, y), mask in labels:
+        grid_image.paste("red", (x, y, x + mask.width, y + mask.height), mask)
     
-    return grid_image, cell_mapping
\ No newline at end of file
+    return grid_image, dict(cell_mapping)
\ No newline at end of file
@@ -2,16 +2,24 @@
 """
 Simple test script for the FastAPI backend
 """
+import mimetypes
 import requests
 import os
 import sys
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "http://localhost:8000"
+
+# One keep-alive session so every request reuses the same connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 def test_api():
     """Test the FastAPI detection endpoint"""
     
     # Check if server is running
     try:
-        response = requests.get("http://localhost:8000/")
+        response = SESSION.get(f"{BASE_URL}/")
         print(f"✅ Server is running: {response.json()}")
     except requests.exceptions.ConnectionError:
         print("❌ Server is not running. Start it with: uv run python api_server.py")
@@ -32,13 +40,16 @@ def test_api():
     
     print(f"📷 Using test image: {test_image}")
     
-    # Test single object detection
-    print("\n🔍 Testing single object detection...")
+    # Send the image with its type: the server only accepts image/* uploads
+    content_type = mimetypes.guess_type(test_image)[0] or "image/jpeg"
+    
     with open(test_image, 'rb') as f:
-        files = {'file': f}
+        # Test single object detection
+        print("\n🔍 Testing single object detection...")
+        files = {'file': (test_image, f, content_type)}
         data = {'targets': 'car'}
         
-        response = requests.post("http://localhost:8000/api/detect", files=files, data=data)
+        response = SESSION.post(f"{BASE_URL}/api/detect", files=files, data=data)
         
         if response.status_code == 200:
             result = response.json()
@@ -50,14 +61,14 @@ def test_api():
                 print(f"     * {r['object']}: {r['confidence']} ({r['confidence_score']:.1f}%)")
         else:
             print(f"❌ Single detection failed: {response.status_code} - {response.text}")
-    
-    # Test multi-object detection
-    print("\n🔍 Testing multi-object detection...")
-    with open(test_image, 'rb') as f:
-        files = {'file': f}
+        
+        # Test multi-object detection, re-sending the same open file
+        print("\n🔍 Testing multi-object detection...")
+        f.seek(0)
+        files = {'file': (test_image, f, content_type)}
         data = {'targets': 'car, person, building'}
         
-        response = requests.post("http://localhost:8000/api/detect", files=files, data=data)
+        response = SESSION.post(f"{BASE_URL}/api/detect", files=files, data=data)
         
         if response.status_code == 200:
             result = response.json()